@@ -3,56 +3,68 @@ import os
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
+# Read .env once at import rather than on every connect
+load_dotenv()
+
 
 class DBManager:
-    """Handles MongoDB operations."""
+    """Handles MongoDB operations. Process-wide singleton: every DBManager() shares one pooled client."""
 
     _instance = None
 
+    # Connection defaults, overridable per call through client_options.
+    # Pool sizes are set by the models (Base.POOL_MIN / Base.POOL_MAX), not here.
+    DEFAULT_CLIENT_OPTIONS = {
+        "maxIdleTimeMS": 60000,
+        "serverSelectionTimeoutMS": 3000,
+    }
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.db = None
+            cls._instance.client = None
+        return cls._instance
+
     def __init__(
             self,
             mongo_uri: str | None = None,
-            db_name: str | None = None
+            db_name: str | None = None,
+            **client_options
     ):
-        """Initializes the main application class."""
-        self.db = None
-        self.client = None
+        """Initializes the main application class. Repeat constructions reuse the existing connection."""
+        if self.client is not None:
+            return
 
         print(f"🚀 DB Manager started")
-        self.setup_mongodb(mongo_uri, db_name)
+        self.setup_mongodb(mongo_uri, db_name, **client_options)
 
-    def get_instance(self):
-        if DBManager._instance is not None:
-            return self.db
-
-        self.setup_mongodb()
-        return self.get_instance()
+    @classmethod
+    def get_instance(cls, **client_options):
+        """Return the shared database handle, connecting on first use."""
+        if cls._instance is None or cls._instance.client is None:
+            cls(**client_options)
+        return cls._instance.db
 
     def setup_mongodb(
             self,
             mongo_uri: str | None = None,
-            db_name: str | None = None
+            db_name: str | None = None,
+            **client_options
     ):
-        """Connect to MongoDB."""
-        load_dotenv()
+        """Connect to MongoDB. Extra keyword arguments are passed to MongoClient (pool size, compressors...)."""
         # Use defaults if env vars are missing
         mongo_uri = mongo_uri or os.getenv("MONGO_URI", "mongodb://localhost:27017")
         db_name = db_name or os.getenv("DATABASE_NAME", "InstagramStat")
+        client_options = {**self.DEFAULT_CLIENT_OPTIONS, **client_options}
         try:
-            self.client = MongoClient(mongo_uri)
+            self.client = MongoClient(mongo_uri, **client_options)
             self.db = self.client[db_name]
-            DBManager._instance = self
             print(f"Connected to database: {db_name} @ {mongo_uri[:5]}...")
         except Exception as e:
             print(f"Failed to connect to MongoDB at {mongo_uri}: {e}")
             raise
 
 
-_db_manager_instance = None
-
-
 def get_db():
-    global _db_manager_instance
-    if _db_manager_instance is None:
-        _db_manager_instance = DBManager()
-    return _db_manager_instance.db
+    return DBManager.get_instance()
@@ -1,15 +1,22 @@
+import functools
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Iterator
 
 from colorama import init, Fore, Style
 from dotenv import load_dotenv
 from instagrapi import Client
-from instagrapi.exceptions import TwoFactorRequired
+from instagrapi.exceptions import TwoFactorRequired, LoginRequired
 from instagrapi.types import UserShort
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from models.base import Base
 from models.report import Report
 from models.user import User
 from utils.time import get_morning_time
@@ -17,13 +24,21 @@ from utils.time import get_morning_time
 init()
 load_dotenv()
 
+# Upper bound on Instagram requests in flight at once, so concurrent fetches don't trip rate limits
+IG_SEMAPHORE = threading.BoundedSemaphore(int(os.getenv("IG_CONCURRENCY", "3")))
+
+# Seconds a saved session stays trusted after it was last validated against Instagram
+SESSION_PROBE_INTERVAL = 3600
+
 
 class InstagramFollower:
     def __init__(self):
         """Initialize the Instagram follower analyzer with user settings."""
         self._print_header()
         self.start_time = time.time()
-        self.client = self._init_client()
+        # Connect to MongoDB and ensure indexes eagerly at startup, so the first query is not the one paying
+        Base.warm_cache(Report, User)
+        self._client = None
         self.dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
         self.force_run = os.getenv("FORCE_RUN", "false").lower() == "true"
         if self.dry_run:
@@ -32,6 +47,13 @@ class InstagramFollower:
             print(f"{Fore.YELLOW}⚠️  FORCE RUN MODE ENABLED - Will regenerate today's report{Style.RESET_ALL}")
         self.amount = 10 if self.dry_run else 0
 
+    @property
+    def client(self) -> Client:
+        """Instagram client, logged in on first use so runs that never reach Instagram skip the login."""
+        if self._client is None:
+            self._client = self._init_client()
+        return self._client
+
     @staticmethod
     def _print_header():
         """Display the program header with formatting."""
@@ -60,13 +82,27 @@ class InstagramFollower:
             print(f"{Fore.RED}Credentials missing in .env{Style.RESET_ALL}")
             exit(1)
         client = Client()
-        sf = Path(f"session/{user}_session.json");
+        InstagramFollower._mount_adapters(client)
+        sf, vf = InstagramFollower._session_files(user)
         sf.parent.mkdir(exist_ok=True)
 
+        def save_settings():
+            # Only rewrite the file when the settings changed, then record the session as validated now
+            settings = json.dumps(client.get_settings(), indent=4)
+            if not sf.exists() or sf.read_text() != settings:
+                sf.write_text(settings)
+            vf.write_text(json.dumps({"last_valid": time.time()}))
+
+        def recently_validated() -> bool:
+            try:
+                return time.time() - json.loads(vf.read_text())["last_valid"] < SESSION_PROBE_INTERVAL
+            except (OSError, ValueError, KeyError):
+                return False
+
         def do_login():
             try:
                 client.login(user, pwd)
-                client.dump_settings(sf)
+                save_settings()
             except TwoFactorRequired:
                 print(f"{Fore.YELLOW}🔐 2FA required for @{user}{Style.RESET_ALL}")
                 verification_code = input("Enter 2FA code: ").strip()
@@ -74,14 +110,17 @@ class InstagramFollower:
                     print(f"{Fore.RED}❌ No 2FA code provided{Style.RESET_ALL}")
                     exit(1)
                 client.login(user, pwd, verification_code=verification_code)
-                client.dump_settings(sf)
+                save_settings()
                 print(f"{Fore.GREEN}✅ Login successful with 2FA{Style.RESET_ALL}")
 
         if sf.exists():
             print(f"{Fore.BLUE}🔑 Loading session for @{user}...{Style.RESET_ALL}")
             try:
                 client.load_settings(sf)
-                client.user_following(str(client.user_id), amount=1)
+                # A session validated recently is trusted without another Instagram round-trip
+                if not recently_validated():
+                    client.user_following(str(client.user_id), amount=1)
+                    save_settings()
                 print(f"{Fore.GREEN}✅ Session loaded{Style.RESET_ALL}")
             except Exception:
                 print(f"{Fore.RED}Session failed, logging in...{Style.RESET_ALL}")
@@ -92,23 +131,73 @@ class InstagramFollower:
             print(f"{Fore.GREEN}✅ Session saved{Style.RESET_ALL}")
         return client
 
+    def _session_copy(self) -> Client:
+        """A second client carrying the logged-in session, for fetches that run concurrently with self.client."""
+        client = Client(settings=self.client.get_settings())
+        self._mount_adapters(client)
+        return client
+
+    @staticmethod
+    def _session_files(user: str) -> tuple[Path, Path]:
+        """Session settings file and its sidecar holding the last successful validation time."""
+        return Path(f"session/{user}_session.json"), Path(f"session/{user}_validated.json")
+
+    def _invalidate_session(self):
+        """Forget the trusted session so the next client access probes it and logs in again if needed."""
+        self._session_files(os.getenv('INSTAGRAM_USERNAME', ''))[1].unlink(missing_ok=True)
+        self._client = None
+
+    @staticmethod
+    def _mount_adapters(client: Client):
+        """Keep-alive pools sized for the concurrent fetches, with retries on transient gateway errors."""
+        # 429s are left to instagrapi, which raises its own rate-limit exceptions. Once retries run out,
+        # the last response is returned (not raised as RetryError) so instagrapi's status handling sees it
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False)
+        for session in (client.private, client.public):
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+
     def get_followers(self):
         """ Fetches the followers of the logged-in user.  """
         print(f"\n{Fore.BLUE}📥 Fetching followers...{Style.RESET_ALL}")
         t0 = time.time()
-        followers = self.client.user_followers(str(self.client.user_id), amount=self.amount)
-        users = [self._to_user(u) for u in followers.values()]
+        # Keyed by id: pages can overlap, and user_followers deduplicated the same way
+        unique: Dict[str, User] = {}
+        for batch in self.iter_followers():
+            unique.update((u.id, u) for u in batch)
+        users = list(unique.values())
         print(
             f"{Fore.GREEN}✅ Retrieved {Fore.YELLOW}{len(users)}{Fore.GREEN}"
             f" followers in {Fore.YELLOW}{time.time() - t0:.2f}s{Style.RESET_ALL}"
         )
         return users
 
+    def iter_followers(self, batch: int = 200) -> Iterator[List[User]]:
+        """
+        Yield the logged-in user's followers page by page as they arrive.
+        The semaphore is held per page, so other Instagram calls can interleave between pages.
+        """
+        user_id, cursor, fetched = str(self.client.user_id), "", 0
+        while True:
+            # Never ask Instagram for more than the dry-run limit still allows
+            max_amount = min(batch, self.amount - fetched) if self.amount else batch
+            with IG_SEMAPHORE:
+                page, cursor = self.client.user_followers_v1_chunk(user_id, max_amount=max_amount, max_id=cursor)
+            if self.amount:
+                # Safety net in case a page overshoots max_amount
+                page = page[:self.amount - fetched]
+            fetched += len(page)
+            yield [self._to_user(u) for u in page]
+            if not cursor or (self.amount and fetched >= self.amount):
+                return
+
     def get_following(self):
         """ Fetches the following of the logged-in user.  """
         print(f"\n{Fore.BLUE}📥 Fetching following...{Style.RESET_ALL}")
         t0 = time.time()
-        followers = self.client.user_following_v1(str(self.client.user_id), amount=self.amount)
+        # Runs alongside get_followers, so it paginates on its own client instead of sharing one
+        client = self._session_copy()
+        with IG_SEMAPHORE:
+            followers = client.user_following_v1(str(client.user_id), amount=self.amount)
         users = [self._to_user(u) for u in followers]
         print(
             f"{Fore.GREEN}✅ Retrieved {Fore.YELLOW}{len(users)}{Fore.GREEN}"
@@ -130,33 +219,46 @@ class InstagramFollower:
         # Handle both User objects and dictionaries
         if followers and isinstance(followers[0], dict):
             # We're dealing with dictionaries
-            fids = {u.get('id') for u in followers if u.get('id')}
-            gids = {u.get('id') for u in following if u.get('id')}
+            fids = {u.get('_id') for u in followers if u.get('_id')}
+            gids = {u.get('_id') for u in following if u.get('_id')}
         else:
             # We're dealing with User objects
             fids = {u.id for u in followers}
             gids = {u.id for u in following}
 
+        # One intersection gives all three cardinalities: |F - G| = |F| - |F & G|
+        mutual = len(fids & gids)
         return {
             "followers": len(followers),
             "following": len(following),
-            "mutual": len(fids & gids),
-            "followers_only": len(fids - gids),
-            "following_only": len(gids - fids)
+            "mutual": mutual,
+            "followers_only": len(fids) - mutual,
+            "following_only": len(gids) - mutual
         }
 
     def generate_report(self, followers: List[User], following: List[User]) -> Report:
         """Generate a new report based on current followers and following."""
         print(f"\n{Fore.BLUE}📊 Generating report...{Style.RESET_ALL}")
         t0 = time.time()
-        fids, gids = {u.id for u in followers}, {u.id for u in following}
-        users: Dict[str, Dict] = {}
-        for u in followers + following:
-            d = users.setdefault(u.id, u.get_dict() | {'type': []})
-            if u.id in fids and 'follower' not in d['type']:
-                d['type'].append('follower')
-            if u.id in gids and 'following' not in d['type']:
-                d['type'].append('following')
+        # One pass per list: followers create entries, following extends them or adds new ones
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for u in followers:
+            entry = by_id[u.id] = u.get_dict()
+            entry['type'] = ['follower']
+        # Before following is merged in, the keys are exactly the follower ids
+        follower_ids = list(by_id)
+        following_ids = []
+        for u in following:
+            entry = by_id.get(u.id)
+            if entry is None:
+                entry = by_id[u.id] = u.get_dict()
+                entry['type'] = ['following']
+            elif entry['type'][-1] != 'following':
+                entry['type'].append('following')
+            else:
+                continue
+            following_ids.append(u.id)
+        users = list(by_id.values())
 
         generated_at = get_morning_time()
         report = Report(
@@ -164,7 +266,10 @@ class InstagramFollower:
             generated_at=get_morning_time(),
             num_followers=len(followers),
             num_following=len(following),
-            users=list(users.values())
+            users=users,
+            # Collected during the merge, so the id lists match users exactly
+            follower_ids=sorted(follower_ids),
+            following_ids=sorted(following_ids)
         )
         report.save()
         print(f"{Fore.GREEN}✅ Report generated in {Fore.YELLOW}{time.time() - t0:.2f}s{Style.RESET_ALL}")
@@ -202,12 +307,18 @@ class InstagramFollower:
             ('unfollowed_count', '➖ Unfollowed', Fore.RED, getattr(report, 'unfollowed', []))
         ]
         content.append(f"Previous: {stats.get('previous_report_date')}")
+        # Built once per report so each listed user is a dict lookup rather than a scan of users
+        indexes: Dict[bool, Dict[str, Dict[str, Any]]] = {}
         for key, label, color, lst in changed:
             cnt = stats.get(key, 0)
             if cnt:
                 content.append(f"{color}{label}: {cnt}{Style.RESET_ALL}")
+                is_new = 'new' in key
+                if is_new not in indexes:
+                    indexes[is_new] = (report if is_new else last).get_user_index()
+                index = indexes[is_new]
                 for i, uid in enumerate(lst, 1):
-                    user = (report if 'new' in key else last).get_user_by_id(uid)
+                    user = index.get(str(uid))
                     if user:
                         username = user.get('username', 'unknown')
                         full_name = user.get('full_name', '').strip()
@@ -225,17 +336,24 @@ class InstagramFollower:
             content.append(f"{col}{label}: {prefix}{val}{Style.RESET_ALL}")
         self._print_box("Changes Analysis", content)
 
+    @staticmethod
+    def _diff(curr: set, prev: set) -> tuple[List[str], List[str]]:
+        """Split the symmetric difference into (added, removed) with one membership test per changed id."""
+        # Most days nothing changes; equal sets exit on the length check or a single scan
+        if curr == prev:
+            return [], []
+        added, removed = [], []
+        for uid in curr ^ prev:
+            (added if uid in curr else removed).append(uid)
+        return added, removed
+
     def analyse_reports(self, report: Report, last: Report):
         """Analyze differences between current and previous reports."""
         print(f"\n{Fore.BLUE}🔍 Analyzing since {last.generated_at:%Y-%m-%d}...{Style.RESET_ALL}")
-        curr_f = set(report.get_user_ids_by_type('follower'))
-        prev_f = set(last.get_user_ids_by_type('follower'))
-        curr_g = set(report.get_user_ids_by_type('following'))
-        prev_g = set(last.get_user_ids_by_type('following'))
-        report.new_followers = list(curr_f - prev_f)
-        report.lost_followers = list(prev_f - curr_f)
-        report.new_following = list(curr_g - prev_g)
-        report.unfollowed = list(prev_g - curr_g)
+        curr_f, curr_g = report.split_user_ids()
+        prev_f, prev_g = last.split_user_ids()
+        report.new_followers, report.lost_followers = self._diff(curr_f, prev_f)
+        report.new_following, report.unfollowed = self._diff(curr_g, prev_g)
         report.stats = {
             'new_followers_count': len(report.new_followers),
             'lost_followers_count': len(report.lost_followers),
@@ -256,24 +374,30 @@ class InstagramFollower:
         content_width = max(len(line) for line in content) if content else 0
         width = max(title_width + 6, content_width + 6, max_width)
 
-        print(f"\n{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
-        print(f"{color}│{title.center(width - 2)}│{Style.RESET_ALL}")
-        print(f"{color}├{'─' * (width - 2)}┤{Style.RESET_ALL}")
-        for line in content:
+        border = '─' * (width - 2)
+
+        def row(line: str) -> str:
             # Handle lines that might be longer than the box width
             if len(line) > width - 6:
                 # Truncate very long lines
-                truncated_line = line[:width - 9] + "..."
-                print(f"{color}│ {truncated_line}{' ' * (width - len(truncated_line) - 3)}│{Style.RESET_ALL}")
-            else:
-                print(f"{color}│ {line}{' ' * (width - len(line) - 3)}│{Style.RESET_ALL}")
-        print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+                line = line[:width - 9] + "..."
+            return f"{color}│ {line}{' ' * (width - len(line) - 3)}│{Style.RESET_ALL}"
+
+        # Build the whole box and write it with a single print call
+        print("\n".join([
+            f"\n{color}┌{border}┐{Style.RESET_ALL}",
+            f"{color}│{title.center(width - 2)}│{Style.RESET_ALL}",
+            f"{color}├{border}┤{Style.RESET_ALL}",
+            *map(row, content),
+            f"{color}└{border}┘{Style.RESET_ALL}",
+        ]))
 
     @staticmethod
-    def _exception_not_following_back():
-        """ Get a list of exceptions for users who are not following back. """
+    @functools.cache
+    def _exception_not_following_back() -> frozenset:
+        """ Get the lowercased set of exceptions for users who are not following back, parsed once. """
         usernames = os.getenv("EXCEPTION_NOT_FOLLOWING_BACK", "")
-        return [username.strip() for username in usernames.split(",") if username.strip()]
+        return frozenset(username.strip().lower() for username in usernames.split(",") if username.strip())
 
     @staticmethod
     def not_following_back(report: Report, filename: str = "not_following_back.json"):
@@ -281,13 +405,11 @@ class InstagramFollower:
         urls = []
         exceptions = InstagramFollower._exception_not_following_back()
         for user in report.users:
+            if user.get("type", []) != ["following"]:
+                continue
             username = user.get("username", "").strip()
-            types = user.get("type", [])
-
             if username.lower() in exceptions:
                 continue
-            if types != ["following"]:
-                continue
 
             urls.append(f"https://www.instagram.com/{username}/")
 
@@ -298,26 +420,52 @@ class InstagramFollower:
         with open(filepath, "w") as save_file:
             json.dump(urls, save_file)
 
+    def _fetch_relationships(self, executor: ThreadPoolExecutor) -> tuple[List[User], List[User]]:
+        """
+        Fetch followers and following concurrently: followers on self.client, following on a
+        _session_copy() of it, so the two threads never share one client.
+        """
+        # Log in here, once, before the fetch threads start; the copy is built from this session
+        _ = self.client
+        followers_future = executor.submit(self.get_followers)
+        following_future = executor.submit(self.get_following)
+        return followers_future.result(), following_future.result()
+
     def run(self):
         """Run the Instagram follower analysis process."""
         print(f"{Fore.BLUE}🔄 Starting analysis...{Style.RESET_ALL}")
         today = get_morning_time()
-        existing = Report.find_one({"generated_at": today})
-        if existing and not self.force_run and not self.dry_run:
+        # Forced and dry runs regenerate anyway; otherwise only check existence, without the users array
+        exists = not self.force_run and not self.dry_run and \
+            Report.find_one({"generated_at": today}, projection={"_id": 1}) is not None
+        if exists:
             print(f"\n{Fore.YELLOW}ℹ️ Report exists for {today:%Y-%m-%d}{Style.RESET_ALL}")
             if self._get_choice("View existing? [Y/n]: ", True):
+                existing = Report.find_one({"generated_at": today})
                 last = Report.find_one({"generated_at": {"$lt": today}}, sort=[("generated_at", -1)])
                 self.print_summary(existing)
                 if last:
                     self.print_changes(existing, last)
             return
 
-        print(f"{Fore.BLUE}📈 Fetching followers and following...{Style.RESET_ALL}")
-        followers = self.get_followers()
-        following = self.get_following()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # The previous report does not depend on today's data, so load it while Instagram is fetched
+            last_future = executor.submit(
+                Report.find_one, {"generated_at": {"$lt": today}}, sort=[("generated_at", -1)]
+            )
+
+            print(f"{Fore.BLUE}📈 Fetching followers and following...{Style.RESET_ALL}")
+            try:
+                followers, following = self._fetch_relationships(executor)
+            except LoginRequired:
+                # The session was trusted without a probe but has expired: log in again and refetch once
+                print(f"{Fore.RED}Session expired, logging in...{Style.RESET_ALL}")
+                self._invalidate_session()
+                followers, following = self._fetch_relationships(executor)
 
         print(f"\n{Fore.BLUE}💾 Updating user DB...{Style.RESET_ALL}")
-        User.update_many(followers + following)
+        # Mutual users appear in both lists; upsert each of them once
+        User.update_many({u.id: u for u in chain(followers, following)}.values())
 
         print(f"{Fore.GREEN}✅ User database updated{Style.RESET_ALL}")
 
@@ -325,7 +473,7 @@ class InstagramFollower:
         counts = self.get_relationship_counts(followers, following)
         self.print_summary(report, counts)
 
-        last = Report.find_one({"generated_at": {"$lt": today}}, sort=[("generated_at", -1)])
+        last = last_future.result()
         if last:
             self.analyse_reports(report, last)
             self.print_changes(report, last)
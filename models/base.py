@@ -1,24 +1,115 @@
+import logging
+import os
+import threading
 import time
-from dataclasses import dataclass, field, asdict, fields
-from typing import Optional, Union, Any, Type, TypeVar, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import Optional, Union, Any, Type, TypeVar, Mapping, ClassVar, Iterator, Iterable
 
+import bson
 from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
 from pymongo import UpdateOne, InsertOne, DeleteOne
 from pymongo.collection import Collection
+from pymongo.database import Database
 from pymongo.results import UpdateResult, BulkWriteResult, InsertOneResult, DeleteResult
 
 from db_manager import DBManager
 from utils.decorators import time_query
 
 USE_LOWERCASE_COLLECTION = True
+WRITE_BATCH_SIZE = 1000
+BULK_WRITE_WORKERS = 4
+# Bookkeeping fields update_many never overwrites from entity data
+META_FIELDS = frozenset({"_id", "c", "deleted"})
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound='Base')
 
+# Shared _dirty value of a clean tracked instance
+_CLEAN: frozenset[str] = frozenset()
+
+
+def compile_stages(stages: list[dict]) -> list[RawBSONDocument]:
+    """
+    Pre-encode static aggregation stages so they are not re-encoded on every aggregate() call.
+    Encode them once at module load, e.g. `STAGES = compile_stages([...])`, and build each
+    pipeline as `[{"$match": query}, *STAGES]`.
+    """
+    return [RawBSONDocument(bson.encode(stage)) for stage in stages]
+
+
+def _merge_bulk_results(results: list[BulkWriteResult], chunk_size: int) -> BulkWriteResult:
+    """Combine the results of consecutive bulk_write chunks into one BulkWriteResult."""
+    merged = {"writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+              "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+    for offset, result in enumerate(results):
+        api_result = result.bulk_api_result
+        for key in ("nInserted", "nUpserted", "nMatched", "nModified", "nRemoved"):
+            merged[key] += api_result[key]
+        merged["upserted"].extend({**u, "index": u["index"] + offset * chunk_size} for u in api_result["upserted"])
+    return BulkWriteResult(merged, acknowledged=True)
+
+
+# Per-thread {model class: (buffer, size, ordered)} of the batch() blocks open on that thread
+_batch_state = threading.local()
+
+
+def _active_batches() -> dict[type, tuple[list, int, bool]]:
+    """The calling thread's open batches, created on first use."""
+    batches = getattr(_batch_state, 'batches', None)
+    if batches is None:
+        batches = _batch_state.batches = {}
+    return batches
+
 
 @dataclass
+class DeferredResult:
+    """Returned by writes queued inside Base.batch(); the operation is sent when the batch flushes."""
+    operation: Union[UpdateOne, InsertOne, DeleteOne]
+
+
+@dataclass(slots=True)
 class Base:
     """Handles MongoDB operations."""
     _id: ObjectId = field(default_factory=ObjectId)
+    # Names of fields assigned since the last load/save, only on TRACK_CHANGES models; never persisted.
+    # None means untracked (save() writes every field); the set is created on the first tracked assignment.
+    _dirty: set[str] | None = field(default=None, init=False, repr=False, compare=False,
+                                    metadata={"persist": False})
+
+    _collection_name: ClassVar[str | None] = None
+    _field_names: ClassVar[tuple[str, ...] | None] = None
+
+    # Database handle shared by all models, bound on first use
+    _db: ClassVar[Database | None] = None
+
+    # Collection handles are resolved once per name and reused by every CRUD call
+    _collection_cache: ClassVar[dict[str, Collection]] = {}
+    _raw_collection_cache: ClassVar[dict[str, Collection]] = {}
+
+    # Connection pool settings passed to MongoClient when the first collection is resolved.
+    # minPoolSize keeps connections warm so the first query skips the TCP/TLS handshake.
+    POOL_MIN: ClassVar[int] = 4
+    POOL_MAX: ClassVar[int] = 50
+    # Wire compressors in preference order; zlib ships with Python, so it is the fallback
+    # when the optional zstd/snappy packages are not installed
+    COMPRESSORS: ClassVar[str] = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+
+    # Optional override: record assigned fields so save() on a loaded/saved instance only sends those.
+    # Off by default, so models that are only bulk-written (User) skip the __setattr__ hook entirely.
+    TRACK_CHANGES: ClassVar[bool] = False
+
+    # Optional override: fields save() writes only when the document is first inserted ($setOnInsert)
+    IMMUTABLE_FIELDS: ClassVar[frozenset[str]] = frozenset()
+
+    # Optional override: fields fetched when a query does not pass its own projection
+    PROJECTION_DEFAULT: ClassVar[dict | None] = None
+
+    # Optional override: index key lists created by ensure_indexes, e.g. [[("generated_at", -1)]]
+    INDEXES: ClassVar[tuple[list[tuple[str, int]], ...]] = ()
 
     @property
     def id(self):
@@ -37,52 +128,131 @@ class Base:
         class_name = cls.__name__
         return class_name.lower() if USE_LOWERCASE_COLLECTION else class_name
 
+    def __init_subclass__(cls, **kwargs):
+        # Explicit super(): slots=True recreates Base, so the zero-argument form would bind the old class
+        super(Base, cls).__init_subclass__(**kwargs)
+        # Freeze the collection name at class creation so queries never resolve it again
+        cls._collection_name = cls.get_collection_name()
+        if cls.TRACK_CHANGES:
+            cls.__setattr__ = Base._tracking_setattr
+
     @classmethod
     def _get_collection_name(cls) -> str:
-        """Get the collection name for this class."""
-        return cls.get_collection_name()
+        """Get the collection name for this class, frozen when the subclass is created."""
+        return cls._collection_name or cls.get_collection_name()
 
     @classmethod
     def _get_collection(cls) -> Collection:
         """Get the MongoDB collection for this class."""
-        db = DBManager().get_instance()
         collection_name = cls._get_collection_name()
+        collection = Base._collection_cache.get(collection_name)
+        if collection is not None:
+            return collection
+
+        # No existence check: MongoDB creates the collection on first insert
+        collection = cls._get_db()[collection_name]
+        Base._collection_cache[collection_name] = collection
+        return collection
+
+    @classmethod
+    def _get_db(cls) -> Database:
+        """Get the database handle shared by every model, connecting on first use."""
+        if Base._db is None:
+            Base._db = DBManager.get_instance(**cls._client_options())
+        return Base._db
+
+    @staticmethod
+    def _reset_after_fork():
+        """MongoClient is not fork-safe: drop inherited handles so the child process reconnects."""
+        Base._db = None
+        DBManager._instance = None
+        Base._collection_cache.clear()
+        Base._raw_collection_cache.clear()
+
+    @classmethod
+    def _client_options(cls) -> dict[str, Any]:
+        """MongoClient keyword arguments built from the class-level pool settings."""
+        return {"minPoolSize": cls.POOL_MIN, "maxPoolSize": cls.POOL_MAX, "compressors": cls.COMPRESSORS}
 
-        if collection_name not in db.list_collection_names():
-            print(f"Collection '{collection_name}' does not exist - it will be created when data is inserted")
+    @staticmethod
+    def warm_cache(*models: Type["Base"]) -> None:
+        """
+        Resolve the shared client and each model's collection handle up front.
+        Creating the client starts server discovery and the minPoolSize fill in the background,
+        so calling this at startup moves the connection cost off the first query.
+        Each model's INDEXES are then ensured synchronously, so this call blocks until the
+        server is reachable (or server selection times out).
+        """
+        for model in models:
+            model._get_collection()
+            model.ensure_indexes()
 
-        return db[collection_name]
+    @classmethod
+    def ensure_indexes(cls) -> None:
+        """Create the indexes declared in INDEXES; a no-op on the server when they already exist."""
+        if not cls.INDEXES:
+            return
+        collection = cls._get_collection()
+        for keys in cls.INDEXES:
+            collection.create_index(keys)
+
+    @classmethod
+    def _get_raw_collection(cls) -> Collection:
+        """Get the collection configured to return RawBSONDocument, decoded lazily on field access."""
+        collection_name = cls._get_collection_name()
+        collection = Base._raw_collection_cache.get(collection_name)
+        if collection is None:
+            collection = cls._get_collection()
+            collection = collection.with_options(
+                codec_options=collection.codec_options.with_options(document_class=RawBSONDocument)
+            )
+            Base._raw_collection_cache[collection_name] = collection
+        return collection
 
     @classmethod
     @time_query
     def find_one(cls: Type[T], query: dict = None, projection: dict = None,
-                 sort: list[tuple[str, int]] = None) -> Optional[T]:
-        """ Find a single document in the collection, optionally sorted. """
+                 sort: list[tuple[str, int]] = None, raw: bool = False,
+                 hint: str | list | None = None) -> Optional[Union[T, RawBSONDocument]]:
+        """
+        Find a single document in the collection, optionally sorted.
+        With `raw`, the undecoded RawBSONDocument is returned instead of a model instance.
+        `hint` (index name or key list) makes the server skip plan selection.
+        """
         query = query or {}
-        collection = cls._get_collection()
+        if projection is None:
+            projection = cls.PROJECTION_DEFAULT
+        collection = cls._get_raw_collection() if raw else cls._get_collection()
         collection_name = cls._get_collection_name()
-        result = collection.find_one(filter=query, projection=projection, sort=sort)
+        result = collection.find_one(filter=query, projection=projection, sort=sort, hint=hint)
 
-        if result:
-            print(f"Found document in '{collection_name}' matching {query}" + (f" sorted by {sort}" if sort else ""))
-            return cls.from_dict(result)
-        else:
-            print(f"No document found in '{collection_name}' matching {query}" + (f" sorted by {sort}" if sort else ""))
-            return None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s document in '%s' matching %s%s", "Found" if result else "No",
+                         collection_name, query, f" sorted by {sort}" if sort else "")
+        if raw:
+            return result
+        return cls.from_dict(result) if result else None
 
     @classmethod
-    @time_query
-    def find_many(cls: Type[T], query: dict = None, projection: dict | list = None,
-                  sort: list = None, limit: int = 0, skip: int = 0) -> list:
+    def find_iter(cls: Type[T], query: dict = None, projection: dict | list = None, sort: list = None,
+                  limit: int = 0, skip: int = 0, raw: bool = False, batch_size: int = 1000,
+                  hint: str | list | None = None) -> Iterator:
+        """
+        Yield matching documents one at a time straight from the cursor, hydrated as model
+        instances unless `raw` is set, so only one cursor batch is held in memory.
+        """
         query = query or {}
-        collection = cls._get_collection()
-        collection_name = cls._get_collection_name()
+        collection = cls._get_raw_collection() if raw else cls._get_collection()
 
-        if isinstance(projection, list):
+        if projection is None:
+            projection = cls.PROJECTION_DEFAULT
+        elif isinstance(projection, list):
             projection = {field: 1 for field in projection}
 
-        cursor = collection.find(query, projection)
+        cursor = collection.find(query, projection).batch_size(batch_size)
 
+        if hint:
+            cursor = cursor.hint(hint)
         if sort:
             cursor = cursor.sort(sort)
         if skip:
@@ -90,33 +260,106 @@ class Base:
         if limit:
             cursor = cursor.limit(limit)
 
-        results = list(cursor)
-        print(f"Found {len(results)} documents in '{collection_name}' matching query")
-        return [cls.from_dict(doc) for doc in results]
+        if raw:
+            yield from cursor
+        else:
+            for doc in cursor:
+                yield cls.from_dict(doc)
+
+    @classmethod
+    @time_query
+    def find_many(cls: Type[T], query: dict = None, projection: dict | list = None,
+                  sort: list = None, limit: int = 0, skip: int = 0, raw: bool = False,
+                  hint: str | list | None = None, stream: bool = False) -> list | Iterator:
+        """
+        Find all matching documents as model instances.
+        With `raw`, RawBSONDocuments are returned so only the fields a caller reads get decoded.
+        With `stream`, the find_iter generator is returned instead of a list.
+        """
+        if stream:
+            return cls.find_iter(query, projection, sort, limit, skip, raw, hint=hint)
+        results = list(cls.find_iter(query, projection, sort, limit, skip, raw, hint=hint))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %d documents in '%s' matching %s", len(results), cls._get_collection_name(), query)
+        return results
 
     @classmethod
     @time_query
-    def count_documents(cls, query: dict = None) -> int:
+    def count_documents(cls, query: dict = None, hint: str | list | None = None) -> int:
         query = query or {}
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
-        count = collection.count_documents(query)
-        print(f"Counted {count} documents in '{collection_name}' matching query")
+        count = collection.count_documents(query, hint=hint) if hint else collection.count_documents(query)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Counted %d documents in '%s' matching %s", count, collection_name, query)
         return count
 
+    @classmethod
+    @contextmanager
+    def batch(cls, size: int = 1000, ordered: bool = False) -> Iterator[list]:
+        """
+        Queue insert_one/update_one/delete_one calls made on this class inside the block and
+        send them as bulk_write commands of up to `size` operations instead of one round-trip
+        each. Queued calls return a DeferredResult; the remainder is flushed when the block exits
+        normally. If the block raises, the unsent remainder is discarded; batches that already
+        filled up to `size` inside the block have been written and are not rolled back.
+        The batch belongs to the calling thread: writes from other threads are sent immediately.
+        """
+        batches = _active_batches()
+        previous = batches.get(cls)
+        buffer = []
+        batches[cls] = (buffer, size, ordered)
+        try:
+            yield buffer
+        except BaseException:
+            buffer.clear()
+            raise
+        else:
+            cls._flush_batch(buffer, ordered)
+        finally:
+            if previous is None:
+                del batches[cls]
+            else:
+                batches[cls] = previous
+
+    @classmethod
+    def _queue(cls, operation: Union[UpdateOne, InsertOne, DeleteOne]) -> DeferredResult | None:
+        """Add the operation to this thread's active batch of this class, if there is one."""
+        active = _active_batches().get(cls)
+        if active is None:
+            return None
+
+        buffer, size, ordered = active
+        buffer.append(operation)
+        if len(buffer) >= size:
+            cls._flush_batch(buffer, ordered)
+        return DeferredResult(operation)
+
+    @classmethod
+    def _flush_batch(cls, buffer: list, ordered: bool):
+        """Send the queued operations as one bulk write and empty the buffer."""
+        if buffer:
+            cls.bulk_write(list(buffer), ordered=ordered)
+            buffer.clear()
+
     @classmethod
     @time_query
-    def update_one(cls, query: dict, update: dict, upsert: bool = False) -> UpdateResult:
+    def update_one(cls, query: dict, update: dict, upsert: bool = False) -> UpdateResult | DeferredResult:
+        deferred = cls._queue(UpdateOne(query, update, upsert=upsert))
+        if deferred:
+            return deferred
+
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
         result = collection.update_one(query, update, upsert=upsert)
 
-        if result.modified_count:
-            print(f"Updated {result.modified_count} document in '{collection_name}'")
-        elif result.upserted_id:
-            print(f"Inserted new document in '{collection_name}' with id {result.upserted_id}")
-        else:
-            print(f"No documents updated in '{collection_name}' (matched: {result.matched_count})")
+        if logger.isEnabledFor(logging.DEBUG):
+            if result.modified_count:
+                logger.debug("Updated %d document in '%s'", result.modified_count, collection_name)
+            elif result.upserted_id:
+                logger.debug("Inserted new document in '%s' with id %s", collection_name, result.upserted_id)
+            else:
+                logger.debug("No documents updated in '%s' (matched: %d)", collection_name, result.matched_count)
 
         return result
 
@@ -125,25 +368,27 @@ class Base:
         """Helper method to extract update fields from params dictionary."""
         if update_fields is None:
             # update all fields except meta fields
-            return {k: params[k] for k in params if k not in ["_id", "c", "deleted"]}
+            return {k: v for k, v in params.items() if k not in META_FIELDS}
 
         # update specified fields except meta fields
-        return {k: params[k] for k in update_fields if k in params and k not in ["_id", "c", "deleted"]}
+        return {k: params[k] for k in update_fields if k in params and k not in META_FIELDS}
 
     @classmethod
     @time_query
-    def update_many(cls, entities: list["Base"], query_fields=None, update_fields=None, upsert=True, session=None):
-        """Update or insert multiple entities in a single bulk operation."""
-        if not entities:
-            print(f"No entities provided for bulk update in '{cls.__name__}'")
-            return None
-
+    def update_many(cls, entities: Iterable["Base"], query_fields=None, update_fields=None, upsert=True,
+                    session=None, hint: str | list | None = None):
+        """
+        Update or insert multiple entities in a single bulk operation; `hint` applies to every upsert.
+        `entities` may be any iterable (e.g. itertools.chain), consumed once.
+        """
         # Default query fields is _id
         if query_fields is None:
             query_fields = ["_id"]
 
         # Get current timestamp as a Unix timestamp (float)
         current_time = time.time()
+        # Identical for every entity, so build it once and share it between operations
+        set_on_insert = {"c": current_time, "deleted": False}
 
         db_updates = []
         for entity in entities:
@@ -165,20 +410,29 @@ class Base:
                     query_params,
                     {
                         "$set": update_values,
-                        "$setOnInsert": {"c": current_time, "deleted": False}
+                        "$setOnInsert": set_on_insert
                     },
-                    upsert=upsert
+                    upsert=upsert,
+                    hint=hint
                 )
             )
 
-        # Get collection and execute bulk write
-        collection = cls._get_collection()
-        result = collection.bulk_write(db_updates, ordered=False, session=session)
-        print(
-            f"Bulk operation completed on '{cls.__name__}': "
-            f"{result.upserted_count} inserted, "
-            f"{result.modified_count} modified"
-        )
+        if not db_updates:
+            logger.debug("No entities provided for bulk update in '%s'", cls.__name__)
+            return None
+
+        # Execute the bulk write in chunks, concurrently when there is no session
+        chunks = [db_updates[i:i + WRITE_BATCH_SIZE] for i in range(0, len(db_updates), WRITE_BATCH_SIZE)]
+        if session is not None or len(chunks) == 1:
+            # A ClientSession must not be shared between threads
+            results = [cls._bulk_write_fast(chunk, session=session) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=BULK_WRITE_WORKERS) as executor:
+                results = list(executor.map(cls._bulk_write_fast, chunks))
+        result = results[0] if len(results) == 1 else _merge_bulk_results(results, WRITE_BATCH_SIZE)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Bulk operation completed on '%s': %d inserted, %d modified",
+                         cls.__name__, result.upserted_count, result.modified_count)
 
         return result
 
@@ -187,58 +441,79 @@ class Base:
     def bulk_write(
             cls,
             operations: list[Union[UpdateOne, InsertOne, DeleteOne]],
-            ordered: bool = True
+            ordered: bool = False
     ) -> BulkWriteResult | None:
+        """Execute a list of write operations in one bulk command."""
         if not operations:
-            print("No operations provided for bulk update")
+            logger.debug("No operations provided for bulk update")
             return None
 
-        collection = cls._get_collection()
-        collection_name = cls._get_collection_name()
-        result = collection.bulk_write(operations, ordered=ordered)
+        result = cls._bulk_write_fast(operations, ordered=ordered)
 
-        print(
-            f"Bulk operation completed on '{collection_name}': {result.inserted_count} inserted, "
-            f"{result.modified_count} modified, {result.deleted_count} deleted"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Bulk operation completed on '%s': %d inserted, %d modified, %d deleted",
+                         cls._get_collection_name(), result.inserted_count, result.modified_count,
+                         result.deleted_count)
 
         return result
 
+    @classmethod
+    def _bulk_write_fast(
+            cls,
+            operations: list[Union[UpdateOne, InsertOne, DeleteOne]],
+            ordered: bool = False,
+            session=None
+    ) -> BulkWriteResult:
+        """Send a non-empty list of operations as-is: no guard, timing or logging, for internal callers."""
+        return cls._get_collection().bulk_write(operations, ordered=ordered, session=session)
+
     @classmethod
     @time_query
-    def insert_one(cls, document: dict) -> InsertOneResult:
+    def insert_one(cls, document: dict) -> InsertOneResult | DeferredResult:
+        deferred = cls._queue(InsertOne(document))
+        if deferred:
+            return deferred
+
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
         result = collection.insert_one(document)
 
-        print(f"Inserted document into '{collection_name}' with ID: {result.inserted_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Inserted document into '%s' with ID: %s", collection_name, result.inserted_id)
         return result
 
     @classmethod
     @time_query
-    def insert_many(cls, documents: list[dict]) -> InsertOneResult:
+    def insert_many(cls, documents: list[dict], ordered: bool = False) -> list:
+        """Insert documents in chunks of WRITE_BATCH_SIZE and return all inserted ids."""
         if not documents:
-            print("No documents provided for insert_many")
+            logger.debug("No documents provided for insert_many")
             return []
 
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
-        result = collection.insert_many(documents)
+        inserted_ids = []
+        for i in range(0, len(documents), WRITE_BATCH_SIZE):
+            result = collection.insert_many(documents[i:i + WRITE_BATCH_SIZE], ordered=ordered)
+            inserted_ids.extend(result.inserted_ids)
 
-        print(f"Inserted {len(result.inserted_ids)} documents into '{collection_name}'")
-        return result.inserted_ids
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Inserted %d documents into '%s'", len(inserted_ids), collection_name)
+        return inserted_ids
 
     @classmethod
     @time_query
-    def delete_one(cls, query: dict) -> DeleteResult:
+    def delete_one(cls, query: dict) -> DeleteResult | DeferredResult:
+        deferred = cls._queue(DeleteOne(query))
+        if deferred:
+            return deferred
+
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
         result = collection.delete_one(query)
 
-        if result.deleted_count:
-            print(f"Deleted {result.deleted_count} document from '{collection_name}'")
-        else:
-            print(f"No documents deleted from '{collection_name}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Deleted %d document from '%s'", result.deleted_count, collection_name)
 
         return result
 
@@ -249,27 +524,47 @@ class Base:
         collection_name = cls._get_collection_name()
         result = collection.delete_many(query)
 
-        if result.deleted_count:
-            print(f"Deleted {result.deleted_count} documents from '{collection_name}'")
-        else:
-            print(f"No documents deleted from '{collection_name}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Deleted %d documents from '%s'", result.deleted_count, collection_name)
 
         return result
 
     @classmethod
     @time_query
-    def aggregate(cls, pipeline: list[dict], **kwargs) -> list[dict]:
+    def aggregate(cls, pipeline: list[dict | RawBSONDocument], stream: bool = False,
+                  **kwargs) -> list[dict] | Iterator[dict]:
+        """
+        Run an aggregation and return all results. allowDiskUse defaults to True so large
+        $sort/$group stages spill to disk instead of failing.
+        With `stream`, the aggregate_iter generator is returned instead of a list.
+        """
+        if stream:
+            return cls.aggregate_iter(pipeline, batch_size=kwargs.pop('batchSize', 1000), **kwargs)
         if not pipeline:
-            print("No pipeline provided for aggregation")
+            logger.debug("No pipeline provided for aggregation")
             return []
 
+        kwargs.setdefault('allowDiskUse', True)
+        kwargs.setdefault('batchSize', 1000)
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
         results = list(collection.aggregate(pipeline, **kwargs))
 
-        print(f"Aggregation completed on '{collection_name}' with {len(results)} results")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Aggregation completed on '%s' with %d results", collection_name, len(results))
         return results
 
+    @classmethod
+    def aggregate_iter(cls, pipeline: list[dict | RawBSONDocument], batch_size: int = 1000, **kwargs) -> Iterator[dict]:
+        """Run an aggregation and yield results straight from the cursor without building a list."""
+        if not pipeline:
+            logger.debug("No pipeline provided for aggregation")
+            return
+
+        kwargs.setdefault('allowDiskUse', True)
+        collection = cls._get_collection()
+        yield from collection.aggregate(pipeline, batchSize=batch_size, **kwargs)
+
     @classmethod
     @time_query
     def distinct(cls, key: str, query: dict = None) -> list:
@@ -277,12 +572,21 @@ class Base:
         collection = cls._get_collection()
         collection_name = cls._get_collection_name()
         results = collection.distinct(key, query)
-        print(f"Found {len(results)} distinct values for '{key}' in '{collection_name}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %d distinct values for '%s' in '%s'", len(results), key, collection_name)
         return results
 
     @time_query
     def save(self):
-        """Save this object to the database."""
+        """
+        Save this object to the database.
+
+        On TRACK_CHANGES models, an instance that was loaded or already saved only sends the
+        fields assigned since then, and saving with no assignments is a no-op.
+        WARNING: in-place mutations are not assignments and are silently NOT persisted, e.g.
+        `report.users.append(user)` is lost; reassign the field (`report.users = [...]`) instead.
+        Other models and fresh instances always write every field.
+        """
         collection = self.__class__._get_collection()
         collection_name = self.__class__._get_collection_name()
 
@@ -290,28 +594,74 @@ class Base:
 
         # Check if this document already has an _id
         if '_id' in document and document['_id'] is not None:
-            # Update existing document
-            result = collection.update_one({'_id': document['_id']}, {'$set': document}, upsert=True)
-            if result.modified_count:
-                print(f"Updated document in '{collection_name}' with ID: {document['_id']}")
-            else:
-                print(f"No changes to document in '{collection_name}' with ID: {document['_id']}")
+            dirty = self._dirty
+            if dirty is not None and not dirty:
+                logger.debug("No-op save in '%s' with ID: %s", collection_name, document['_id'])
+                return None
+
+            # Update existing document; immutable fields are only written when the upsert inserts
+            immutable = self.IMMUTABLE_FIELDS
+            update = {}
+            names = document.keys() - {'_id'} if dirty is None else dirty
+            changes = {k: document[k] for k in names if k not in immutable}
+            if changes:
+                update['$set'] = changes
+            on_insert = {k: document[k] for k in immutable if k in document}
+            if on_insert:
+                update['$setOnInsert'] = on_insert
+            result = collection.update_one({'_id': document['_id']}, update, upsert=True)
+            self._mark_clean()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s document in '%s' with ID: %s", "Updated" if result.modified_count else "No changes to",
+                             collection_name, document['_id'])
             return result
         else:
             # Insert new document
             result = collection.insert_one(document)
-            print(f"Inserted document into '{collection_name}' with ID: {result.inserted_id}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Inserted document into '%s' with ID: %s", collection_name, result.inserted_id)
             # Update the _id attribute of this object
             self.id = result.inserted_id
+            self._mark_clean()
             return result
 
-    def get_dict(self) -> dict:
-        """Convert the instance to a dictionary, including only dataclass fields."""
-        # Get only the actual dataclass fields
-        field_names = {f.name for f in fields(self)}
-        full_dict = asdict(self)
+    def _tracking_setattr(self, name: str, value: Any):
+        """__setattr__ of TRACK_CHANGES models: record assigned fields so save() only sends what changed."""
+        if not name.startswith('_') and name in self.__dataclass_fields__:
+            # Unset while copy/pickle restores slots, None until the instance is loaded or saved
+            dirty = getattr(self, '_dirty', None)
+            if dirty is not None:
+                if dirty is _CLEAN:
+                    object.__setattr__(self, '_dirty', {name})
+                else:
+                    dirty.add(name)
+        object.__setattr__(self, name, value)
+
+    def _mark_clean(self):
+        """Forget tracked changes, e.g. after the instance was loaded from or written to the database."""
+        if self.TRACK_CHANGES:
+            # Shared empty marker: clean instances allocate no set until a field is assigned
+            self._dirty = _CLEAN
+
+    @classmethod
+    def _get_field_names(cls) -> tuple[str, ...]:
+        """Names of the persisted dataclass fields, computed once per class."""
+        field_names = cls.__dict__.get('_field_names')
+        if field_names is None:
+            field_names = tuple(f.name for f in fields(cls) if f.metadata.get("persist", True))
+            cls._field_names = field_names
+        return field_names
 
-        return {k: v for k, v in full_dict.items() if k in field_names}
+    def get_dict(self) -> dict:
+        """
+        Convert the instance to a dictionary, including only dataclass fields.
+        Values are not copied (unlike dataclasses.asdict); nested models are converted.
+        """
+        result = {}
+        for name in self._get_field_names():
+            value = getattr(self, name)
+            result[name] = value.get_dict() if isinstance(value, Base) else value
+        return result
 
     @classmethod
     def from_dict(cls: Type[T], data: Optional[Union[dict[str, Any], Mapping[str, Any]]]) -> Optional[T]:
@@ -319,13 +669,18 @@ class Base:
         if data is None:
             return None
 
-        # Filter out any keys that aren't field names in the dataclass
-        field_names = {f.name for f in fields(cls)}
-        filtered_data = {k: v for k, v in data.items() if k in field_names}
-        return cls(**filtered_data)
+        # Pick only the dataclass fields; iterating the cached names skips per-call fields() reflection
+        filtered_data = {k: data[k] for k in cls._get_field_names() if k in data}
+        instance = cls(**filtered_data)
+        instance._mark_clean()
+        return instance
 
     def close(self):
         """Close database connection if applicable."""
         if hasattr(self, 'client') and self.client:
             self.client.close()
-            print("MongoDB connection closed")
+            logger.debug("MongoDB connection closed")
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=Base._reset_after_fork)
@@ -1,23 +1,34 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Set, Optional, ClassVar, Tuple
 
 from models.base import Base
 from utils.time import get_morning_time
 
 
-@dataclass
+@dataclass(slots=True)
 class Report(Base):
     """
     Represents a daily Instagram follower/following report.
     Stores user data and analysis results of changes between reports.
     """
+    # Reports are re-saved after analysis; only the changed fields should be sent
+    TRACK_CHANGES: ClassVar[bool] = True
+
+    # The report date never changes once the report exists
+    IMMUTABLE_FIELDS: ClassVar[frozenset[str]] = frozenset({"generated_at"})
+    # Reports are looked up and sorted by date, newest first
+    INDEXES: ClassVar[tuple[list[tuple[str, int]], ...]] = ([("generated_at", -1)],)
+
     # Basic report data
     _id: str = ""
     generated_at: datetime = field(default_factory=get_morning_time)
     num_followers: int = 0
     num_following: int = 0
     users: List[Dict[str, Any]] = field(default_factory=list)
+    # Sorted id lists per relationship, so diffs don't have to scan users
+    follower_ids: List[str] = field(default_factory=list)
+    following_ids: List[str] = field(default_factory=list)
 
     # Analysis results - differences from a previous report
     new_followers: List[str] = field(default_factory=list)
@@ -34,8 +45,28 @@ class Report(Base):
 
     def get_user_ids_by_type(self, user_type: str) -> Set[str]:
         """Get all user IDs of a specific type."""
+        # Reports saved before the id lists existed fall back to scanning users
+        ids = {'follower': self.follower_ids, 'following': self.following_ids}.get(user_type)
+        if ids:
+            return set(ids)
         return {user.get('_id') for user in self.get_users_by_type(user_type) if user.get('_id')}
 
+    def split_user_ids(self) -> Tuple[Set[str], Set[str]]:
+        """Get (follower IDs, following IDs) together, scanning users at most once."""
+        if self.follower_ids or self.following_ids:
+            return set(self.follower_ids), set(self.following_ids)
+        # Reports saved before the id lists existed: one pass fills both sets
+        followers, following = set(), set()
+        for user in self.users:
+            user_id, types = user.get('_id'), user.get('type', [])
+            if not user_id:
+                continue
+            if 'follower' in types:
+                followers.add(user_id)
+            if 'following' in types:
+                following.add(user_id)
+        return followers, following
+
     def get_mutual_users(self) -> List[Dict[str, Any]]:
         """Get users who both follow you and are followed by you."""
         return [user for user in self.users
@@ -58,6 +89,10 @@ class Report(Base):
                 return user
         return None
 
+    def get_user_index(self) -> Dict[str, Dict[str, Any]]:
+        """Map each user ID (as a string) to its user, for repeated lookups without rescanning users."""
+        return {str(user.get('_id')): user for user in self.users}
+
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get a specific user by username."""
         for user in self.users:
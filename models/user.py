@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from models.base import Base
 
 
-@dataclass
+@dataclass(slots=True)
 class User(Base):
     _id: str = ""
     username: str = ""
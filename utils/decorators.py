@@ -1,18 +1,28 @@
+import functools
 import os
 
 import time
 from typing import Any, Callable, TypeVar
 
+from dotenv import load_dotenv
+
 F = TypeVar('F', bound=Callable)
-print_time =  os.getenv("PRINT_QUERY_TIME", "false").lower() == "true"
+
+# Models are imported before main.py loads .env, so load it here for PRINT_QUERY_TIME
+load_dotenv()
+print_time = os.getenv("PRINT_QUERY_TIME", "false").lower() == "true"
 
 
 def time_query(func: F) -> F:
     """
     Decorator to measure and log the execution time of MongoDB queries.
     Handles both instance methods and class methods.
+    When PRINT_QUERY_TIME is off the function is returned unwrapped, so queries pay no overhead.
     """
+    if not print_time:
+        return func
 
+    @functools.wraps(func)
     def wrapper(*args, **kwargs) -> Any:
         start_time = time.time()
         result = func(*args, **kwargs)
@@ -22,7 +32,7 @@ def time_query(func: F) -> F:
         if args and hasattr(args[0], '__name__'):  # Class method (first arg is the class)
             cls = args[0]
             try:
-                collection_name = cls._get_collection_name_cls()
+                collection_name = cls._get_collection_name()
             except:
                 collection_name = cls.__name__.lower()
         elif args:  # Instance method (first arg is self)
@@ -34,8 +44,7 @@ def time_query(func: F) -> F:
         else:
             collection_name = "unknown"
 
-        if print_time:
-            print(f"{func.__name__} on collection '{collection_name}' took {end_time - start_time:.4f} seconds")
+        print(f"{func.__name__} on collection '{collection_name}' took {end_time - start_time:.4f} seconds")
         return result
 
     return wrapper